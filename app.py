@@ -27,26 +27,87 @@ import keyring
 
 import ttkbootstrap as ttk              # For enhanced Tkinter styling
 from ttkbootstrap.constants import *   # Predefined styling constants
-import threading                        # To run tasks in background threads
+import threading                        # To bound the number of background prefetches
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # For background tasks, HTTP fetches and PDF rendering
+from concurrent.futures.process import BrokenProcessPool  # Raised once the PDF worker process has died
+import multiprocessing                  # For the start method of the PDF worker process
 import requests                         # For HTTP requests
-from bs4 import BeautifulSoup           # For parsing HTML pages
+import requests_cache                   # For the on-disk HTTP response cache
+from requests.adapters import HTTPAdapter  # For connection pooling on the session
+from urllib3.util.retry import Retry    # For retrying transient HTTP failures
+from bs4 import BeautifulSoup, SoupStrainer  # For parsing the login page
+from lxml import html as lxml_html      # For fast parsing of the course and gradebook tables
+from lxml import etree                  # For lxml's parser errors
 from datetime import datetime           # For date/time operations
 import re                               # Regular expressions for URL/score parsing
+import functools                        # For memoizing date conversions
+import itertools                        # For streaming table cells
+import hashlib                          # For detecting unchanged gradebook pages
 import json                             # For configuration file read/write
+try:
+    import orjson                       # Faster JSON read/write (optional)
+except ImportError:
+    orjson = None
 import os                               # For OS-level functions
-import matplotlib.pyplot as plt         # For plotting charts
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # To embed matplotlib charts in Tkinter
+import io                               # For in-memory chart images
+import numpy as np                      # For vectorized chart computations
 import tkinter as tk                    # Tkinter core library for GUI
 from tkinter import filedialog, messagebox  # For dialogs in Tkinter
-from reportlab.lib.pagesizes import letter  # For PDF page sizes
-from reportlab.pdfgen import canvas     # For PDF generation
+# matplotlib and reportlab are slow to import: they are imported where first needed
 
 # --- URL and Global Variables ---
 BASE_URL = "https://appsemflo.be"      # Base URL of the remote server
 LOGIN_URL = BASE_URL + "/login"        # URL used for user login
 COURSES_URL = BASE_URL + "/carnet-de-notes"  # URL used to retrieve the courses list
+PERIODS = (1, 2, 3)                    # Periods combined in the "Total" view
 
-session = None  # Global HTTP session variable
+# Shared HTTP session: keeps cookies, reuses keep-alive connections to the server
+# and caches GET responses on disk so repeated views skip the network
+SESSION = requests_cache.CachedSession("notesflo_cache", backend="sqlite", expire_after=600,
+                                       allowable_methods=("GET",))
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                                      max_retries=Retry(total=3, backoff_factor=0.3)))
+# Ask for compressed pages; requests only advertises (and decodes) "br" when brotli is installed
+SESSION.headers.update({
+    "User-Agent": "notesflo/1.0",
+    "Accept-Encoding": requests.utils.DEFAULT_ACCEPT_ENCODING,
+    "Connection": "keep-alive"
+})
+
+# Parsed gradebook pages: url -> (MD5 of the page HTML, parsed notes)
+NOTES_CACHE = {}
+
+# Precompiled regular expressions for period URLs and scores
+_PERIOD_RE = re.compile(r'/p(\d+)')      # Captures the period number in a URL
+_NUM_RE = re.compile(r'[\d.]+')          # Matches the numbers of a score ("15/20")
+_EXAM_KEY_RE = re.compile(r'[0-9a-f]{16}')  # Matches a hashed exam key
+
+# Only the CSRF token input is built when parsing the login page
+CSRF_STRAINER = SoupStrainer("input", attrs={"name": "_csrf_token"})
+
+# CSS class of the table holding the courses list and the gradebook entries
+TABLE_CLASS = "w-full text-md bg-white shadow-md rounded mb-4"
+
+# --- JSON Files ---
+
+def read_json(filename):
+    """
+    Read a JSON file, using orjson when it is installed.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def write_json(filename, obj):
+    """
+    Write an object to a JSON file, using orjson when it is installed.
+    The file is written to a temporary file first and then swapped in, so it is never left half-written.
+    """
+    data = orjson.dumps(obj) if orjson else json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f:
+        f.write(data)
+    os.replace(tmp_filename, filename)
 
 # --- Functions for Networking and Scraping ---
 
@@ -55,9 +116,10 @@ def get_csrf_token(sess):
     Retrieve the CSRF token from the login page.
     """
     try:
-        response = sess.get(LOGIN_URL)
+        with sess.cache_disabled():
+            response = sess.get(LOGIN_URL)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = BeautifulSoup(response.text, "lxml", parse_only=CSRF_STRAINER)
             token_tag = soup.find("input", {"name": "_csrf_token"})
             if token_tag:
                 return token_tag.get("value")
@@ -65,12 +127,16 @@ def get_csrf_token(sess):
         print("Erreur lors de la récupération du CSRF token:", e)
     return None
 
-def login_request(username, password):
+def login_request(username, password, sess=SESSION):
     """
     Attempt to log in with the provided credentials.
+    The token GET and the login POST go through the same session, so the POST
+    reuses the kept-alive connection (and TLS session) opened by the GET.
     """
-    s = requests.Session()
-    csrf_token = get_csrf_token(s)
+    # Start from a clean cookie jar and cache so a previous user's pages are not reused
+    sess.cookies.clear()
+    clear_caches()
+    csrf_token = get_csrf_token(sess)
     if not csrf_token:
         return None
     data = {
@@ -79,24 +145,99 @@ def login_request(username, password):
         "_csrf_token": csrf_token,
         "_remember_me": "on"
     }
-    response = s.post(LOGIN_URL, data=data)
+    with sess.cache_disabled():
+        response = sess.post(LOGIN_URL, data=data)
     # Check login success by the presence of a logout string in the response
     if response.status_code == 200 and "Se déconnecter" in response.text:
-        return s
+        return sess
     return None
 
 def fetch_courses():
     """
     Fetch the courses page HTML.
+    The cached page is always revalidated with the server (a 304 reuses the cached body).
     """
-    global session
-    if session is None:
-        return None
-    response = session.get(COURSES_URL)
+    response = SESSION.get(COURSES_URL, refresh=True)
     if response.status_code == 200:
         return response.text
     return None
 
+def cell_text(cell, separator=""):
+    """
+    Return the text of a table cell with every text piece stripped,
+    joined by separator (same output as BeautifulSoup's get_text(separator, strip=True)).
+    """
+    return separator.join(t.strip() for t in cell.itertext() if t.strip())
+
+def table_markup(html):
+    """
+    Return only the markup of the table with TABLE_CLASS so lxml does not build the rest
+    of the page. Returns the whole page when the table cannot be delimited safely
+    (not found, or containing a nested table).
+    """
+    class_pos = html.find(TABLE_CLASS)
+    start = html.rfind("<table", 0, class_pos) if class_pos >= 0 else -1
+    if start < 0:
+        return html
+    end = html.find("</table>", class_pos)
+    if end < 0 or html.find("<table", class_pos, end) >= 0:
+        return html
+    return html[start:end + len("</table>")]
+
+def find_tables(markup):
+    """
+    Return the tables with TABLE_CLASS in an HTML string ([] if lxml cannot parse it,
+    e.g. a page holding only a comment or starting with an XML declaration).
+    """
+    try:
+        return lxml_html.fromstring(markup).xpath("//table[@class=$cls]", cls=TABLE_CLASS)
+    except (etree.ParserError, ValueError):
+        return []
+
+def table_rows(html, max_cells=None):
+    """
+    Yield the cells of each data row (header row skipped) of the first table
+    with TABLE_CLASS. Only the first max_cells cells of a row are collected.
+    """
+    if not html or not html.strip():
+        return
+    markup = table_markup(html)
+    tables = find_tables(markup)
+    if not tables and markup is not html:
+        # The class text matched something else: parse the whole page
+        tables = find_tables(html)
+    if not tables:
+        return
+    rows = tables[0].iter("tr")
+    next(rows, None)
+    for row in rows:
+        yield list(itertools.islice(row.iter("td"), max_cells))
+
+@functools.lru_cache(maxsize=1024)
+def parse_date(date_str):
+    """
+    Convert a "dd/mm/yyyy" string to a datetime object (None if invalid).
+    Dates repeat a lot across rows and periods, so results are memoized.
+    """
+    parts = date_str.split("/")
+    # Same fields as strptime("%d/%m/%Y") on real dates: 2, 2 and 4 digits
+    if len(parts) != 3 or not all(p.isdigit() and p.isascii() for p in parts):
+        return None
+    day, month, year = parts
+    if len(day) > 2 or len(month) > 2 or len(year) != 4:
+        return None
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+@functools.lru_cache(maxsize=1024)
+def format_date(date_obj):
+    """
+    Convert a datetime object back to a "dd/mm/yyyy" string ("" for None).
+    """
+    return date_obj.strftime("%d/%m/%Y") if date_obj else ""
+
 def parse_courses(html):
     """
     Parse the courses page HTML and extract course details.
@@ -104,35 +245,34 @@ def parse_courses(html):
       - course: course name
       - teacher: teacher name
       - url: complete URL to the gradebook page for the course
+      - base_url: the gradebook URL up to its period segment ("/pN")
+      - url_suffix: the rest of the URL after "/pN" (usually "")
+      - period: the period currently viewed (int)
     """
-    soup = BeautifulSoup(html, "html.parser")
     courses = []
-    table = soup.find("table", class_="w-full text-md bg-white shadow-md rounded mb-4")
-    if table:
-        rows = table.find_all("tr")
-        for row in rows[1:]:
-            tds = row.find_all("td")
-            if len(tds) >= 3:
-                course_name = tds[0].get_text(strip=True)
-                teacher = tds[1].get_text(strip=True)
-                link_tag = tds[2].find("a")
-                if link_tag and "href" in link_tag.attrs:
-                    carnet_url = BASE_URL + link_tag["href"]
-                    courses.append({
-                        "course": course_name,
-                        "teacher": teacher,
-                        "url": carnet_url
-                    })
+    for tds in table_rows(html, max_cells=3):
+        if len(tds) >= 3:
+            course_name = cell_text(tds[0])
+            teacher = cell_text(tds[1])
+            links = tds[2].xpath(".//a")
+            if links and links[0].get("href") is not None:
+                carnet_url = BASE_URL + links[0].get("href")
+                base_url, period, url_suffix = split_period_url(carnet_url)
+                courses.append({
+                    "course": course_name,
+                    "teacher": teacher,
+                    "url": carnet_url,
+                    "base_url": base_url,
+                    "url_suffix": url_suffix,
+                    "period": period
+                })
     return courses
 
 def fetch_notes(url):
     """
     Fetch the gradebook page for a given course URL.
     """
-    global session
-    if session is None:
-        return None
-    response = session.get(url)
+    response = SESSION.get(url)
     if response.status_code == 200:
         return response.text
     return None
@@ -146,53 +286,342 @@ def parse_notes(html):
       - score: the obtained score
       - max_score: the maximum possible score
     """
-    soup = BeautifulSoup(html, "html.parser")
     notes = []
-    table = soup.find("table", class_="w-full text-md bg-white shadow-md rounded mb-4")
-    if table:
-        rows = table.find_all("tr")
-        for row in rows[1:]:
-            tds = row.find_all("td")
-            if len(tds) >= 4:
-                title = tds[1].get_text(strip=True)
-                date_str = tds[2].get_text(strip=True)
+    for tds in table_rows(html, max_cells=4):
+        if len(tds) >= 4:
+            title = cell_text(tds[1])
+            date_str = cell_text(tds[2])
+            date_obj = parse_date(date_str)
+            note_td_text = cell_text(tds[3], " ")
+            numbers = _NUM_RE.findall(note_td_text)
+            if len(numbers) >= 2:
                 try:
-                    date_obj = datetime.strptime(date_str, "%d/%m/%Y")
-                except Exception:
-                    date_obj = None
-                note_td_text = tds[3].get_text(" ", strip=True)
-                numbers = re.findall(r'[\d\.]+', note_td_text)
-                if len(numbers) >= 2:
-                    try:
-                        score = float(numbers[0])
-                        max_score = float(numbers[1])
-                    except:
-                        score, max_score = None, None
-                else:
+                    score = float(numbers[0])
+                    max_score = float(numbers[1])
+                except:
                     score, max_score = None, None
-                notes.append({
-                    "title": title,
-                    "date": date_obj,
-                    "score": score,
-                    "max_score": max_score
-                })
+            else:
+                score, max_score = None, None
+            notes.append({
+                "title": title,
+                "date": date_obj,
+                "score": score,
+                "max_score": max_score
+            })
+    return notes
+
+def parse_notes_cached(url, html):
+    """
+    Parse the gradebook page of a URL, reusing the previous result when the HTML is unchanged.
+    Returns copies of the notes since callers annotate the notes they receive.
+    """
+    digest = hashlib.md5(html.encode()).hexdigest()
+    cached = NOTES_CACHE.get(url)
+    if cached is None or cached[0] != digest:
+        cached = (digest, parse_notes(html))
+        NOTES_CACHE[url] = cached
+    return [dict(n) for n in cached[1]]
+
+def fetch_parsed_notes(url):
+    """
+    Fetch and parse the gradebook page for a given URL.
+    Returns an empty list if the page could not be loaded.
+    """
+    html = fetch_notes(url)
+    return parse_notes_cached(url, html) if html else []
+
+def clear_caches():
+    """
+    Clear the HTTP response cache and the parsed gradebook pages.
+    """
+    SESSION.cache.clear()
+    NOTES_CACHE.clear()
+
+def merge_notes(notes_lists):
+    """
+    Merge the notes of several periods into one list sorted chronologically (undated notes last).
+    """
+    combined_notes = [note for notes in notes_lists for note in notes]
+    combined_notes.sort(key=lambda n: (n["date"] is None, n["date"] or datetime.min))
+    return combined_notes
+
+def fetch_total_notes(course):
+    """
+    Fetch the notes of every period of a course concurrently and merge them.
+    """
+    urls = [period_url(course, p) for p in PERIODS]
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        return merge_notes(executor.map(fetch_parsed_notes, urls))
+
+def fetch_courses_notes(courses, periods):
+    """
+    Fetch the notes of several courses for the given periods, with every
+    (course, period) page fetched concurrently in a single pool. A page shared by
+    several courses is fetched only once.
+    Returns one list of notes per course (merged by date when several periods are asked).
+    """
+    urls = [[period_url(course, p) for p in periods] for course in courses]
+    flat_urls = list(dict.fromkeys(url for course_urls in urls for url in course_urls))
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(flat_urls)))) as executor:
+        pages = dict(zip(flat_urls, executor.map(fetch_parsed_notes, flat_urls)))
+    if len(periods) == 1:
+        return [pages[course_urls[0]] for course_urls in urls]
+    return [merge_notes(pages[url] for url in course_urls) for course_urls in urls]
+
+def cumulative_average(values):
+    """
+    Return the running average of a sequence of percentages as a NumPy array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.cumsum(values) / np.arange(1, values.size + 1)
+
+def draw_grades_chart(ax, dates, percentages):
+    """
+    Draw the individual grades and their cumulative average on a (cleared) matplotlib axes.
+    """
+    ax.clear()
+    ax.plot(dates, percentages, marker='o', linestyle='-', label="Note individuelle")
+    ax.plot(dates, cumulative_average(percentages), marker='', linestyle='--', color='red', label="Moyenne cumulée")
+    ax.set_title("Évolution des notes")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Pourcentage")
+    ax.set_ylim(0, 110)
+    ax.legend()
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.figure.autofmt_xdate()
+
+def format_note_cells(notes, max_title=50):
+    """
+    Return the (date, title, note) display strings of each note for the PDF table.
+    Titles longer than max_title characters are truncated.
+    """
+    cells = []
+    for note in notes:
+        title = note["title"]
+        if len(title) > max_title:
+            title = title[:max_title] + "..."
+        score = note["score"]
+        max_score = note["max_score"]
+        note_str = f"{score}/{max_score}" if score is not None and max_score is not None else ""
+        cells.append((format_date(note["date"]), title, note_str))
+    return cells
+
+
+def draw_pdf_row(text, cells):
+    """
+    Write the date, title and note columns of a PDF table row into a ReportLab text object
+    whose line starts at the row (x=50), then start the next line 20 points lower.
+    Cells are placed with relative moves (Td), so rows keep their reading order.
+    """
+    date_str, title, note_str = cells
+    text.textOut(date_str)
+    text.moveCursor(70, 0)
+    text.textOut(title)
+    text.moveCursor(330, 0)
+    text.textOut(note_str)
+    text.moveCursor(-400, 20)
+
+def build_pdf_report(file_path, period, courses, courses_notes, include_charts=True):
+    """
+    Write the PDF report of the given courses (one list of notes per course) to file_path.
+    Runs in the PDF worker process: it only uses its arguments, never the UI or the session.
+    Charts are only drawn when include_charts is set and a course has at least 2 dated notes.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
+    # One figure is reused for the charts of every course, created with the first chart
+    fig = None
+
+    width, height = letter
+    y = height - 50
+
+    def fits(block_height):
+        # A block fits on the page if it ends above the bottom margin
+        return y - block_height >= 80
+
+    def new_page():
+        nonlocal y
+        c.showPage()
+        y = height - 50
+
+    # A large write buffer lets the document reach the disk in a few writes
+    with open(file_path, "wb", buffering=1 << 20) as fh:
+        c = canvas.Canvas(fh, pagesize=letter)
+
+        c.setFont("Helvetica-Bold", 20)
+        c.drawCentredString(width/2, y, "Rapport de Notes")
+        y -= 40
+        c.setFont("Helvetica", 14)
+        c.drawCentredString(width/2, y, f"Période: {period}")
+        y -= 40
+
+        # Each course is laid out as blocks (heading, rows, average, chart):
+        # a page break only happens when the next block does not fit
+        for course, notes in zip(courses, courses_notes):
+            # Keep the heading with the table header and first row
+            if not fits(65):
+                new_page()
+            c.setFont("Helvetica-Bold", 16)
+            c.drawString(50, y, f"Cours: {course['course']} - {course['teacher']}")
+            y -= 25
+
+            if not notes:
+                c.setFont("Helvetica-Oblique", 12)
+                c.drawString(70, y, "Aucune note disponible.")
+                y -= 20
+            else:
+                # The header and rows of a page are emitted as one text object
+                text = c.beginText(50, y)
+                text.setFont("Helvetica-Bold", 12)
+                draw_pdf_row(text, ("Date", "Titre", "Note"))
+                y -= 20
+                text.setFont("Helvetica", 12)
+                for cells in format_note_cells(notes):
+                    if not fits(20):
+                        c.drawText(text)
+                        new_page()
+                        text = c.beginText(50, y)
+                        text.setFont("Helvetica", 12)
+                    draw_pdf_row(text, cells)
+                    y -= 20
+                c.drawText(text)
+                # Percentages of every scored note, and of the dated ones for the chart
+                values = []
+                chart_dates = []
+                chart_values = []
+                for note in notes:
+                    if note["score"] is not None and note["max_score"] is not None:
+                        val = note["score"] / note["max_score"] * 100
+                        values.append(val)
+                        if note["date"]:
+                            chart_dates.append(note["date"])
+                            chart_values.append(val)
+                values = np.asarray(values, dtype=np.float64)
+                if values.size:
+                    if not fits(30):
+                        new_page()
+                    c.setFont("Helvetica-Bold", 12)
+                    c.drawString(50, y, f"Moyenne: {values.mean():.1f}%")
+                    y -= 30
+                if include_charts and len(chart_dates) >= 2:
+                    if not fits(220):
+                        new_page()
+                    if fig is None:
+                        from matplotlib.figure import Figure
+                        from matplotlib.backends.backend_agg import FigureCanvasAgg
+                        from PIL import Image  # Installed with matplotlib
+                        # Rendered by Agg directly: pyplot is not needed here
+                        fig = Figure(figsize=(5, 3))
+                        FigureCanvasAgg(fig)
+                        ax = fig.add_subplot(111)
+                    dates = np.array(chart_dates, dtype="datetime64[D]")
+                    order = np.argsort(dates, kind="stable")
+                    draw_grades_chart(ax, dates[order], np.asarray(chart_values, dtype=np.float64)[order])
+                    # Keep the PNG in memory instead of a temporary file
+                    buf = io.BytesIO()
+                    fig.savefig(buf, format="png", dpi=100)
+                    buf.seek(0)
+                    # A 64 colors palette is plenty for a line chart and shrinks the embedded image
+                    chart = Image.open(buf).convert("RGB").quantize(colors=64)
+                    c.drawImage(ImageReader(chart), 50, y-200, width=500, height=200)
+                    y -= 220
+            y -= 30
+        c.save()
+
+def hash_exam_key(raw_key):
+    """
+    Hash a full "url_date_title" exam key to a short 16 hex characters key.
+    """
+    return hashlib.blake2b(raw_key.encode(), digest_size=8).hexdigest()
+
+@functools.lru_cache(maxsize=4096)
+def make_exam_key(course_url, date_str, title):
+    """
+    Return the short key identifying an exam in the ignored exams.
+    """
+    return hash_exam_key(f"{course_url}_{date_str}_{title}")
+
+def prepare_notes(notes, course_url):
+    """
+    Compute once per note its display date (_date_str) and its ignore key (_key).
+    """
+    for n in notes:
+        n["_date_str"] = date_str = format_date(n["date"])
+        n["_key"] = make_exam_key(course_url, date_str, n["title"])
     return notes
 
-def update_period_url(url, delta):
+def build_notes_view(notes, ignored_exams):
     """
-    Update the period parameter in the URL by delta.
-    Returns a tuple (new_url, new_period).
+    Compute everything needed to display prepared notes, without touching Tk.
+    Returns a tuple (rows, average, dates, percentages):
+      - rows: (values, tag, exam_key, full_title) for each treeview row
+      - average: average percentage of the non-ignored notes (None if there is none)
+      - dates, percentages: chronologically sorted chart arrays of the non-ignored notes
     """
-    match = re.search(r'/p(\d+)', url)
+    rows = []
+    total = 0
+    cnt = 0
+    # Chart data is collected as parallel arrays (dates, scores, max scores)
+    chart_dates = []
+    chart_scores = []
+    chart_maxes = []
+    for note in notes:
+        score = note["score"]
+        max_score = note["max_score"]
+        if score is not None and max_score is not None:
+            note_str = f"{score}/{max_score}"
+            val = score / max_score * 100
+            perc = f"{val:.1f}%"
+        else:
+            note_str = ""
+            perc = ""
+            val = None
+        full_title = note["title"]
+        disp_title = full_title if len(full_title) <= 30 else full_title[:30] + "..."
+        exam_key = note["_key"]
+        tag = ""
+        if exam_key in ignored_exams:
+            tag = "ignored"
+        else:
+            if val is not None:
+                if val < 50:
+                    tag = "low"
+                elif val >= 80:
+                    tag = "high"
+                total += val
+                cnt += 1
+                if note["date"] and max_score:
+                    chart_dates.append(note["date"])
+                    chart_scores.append(score)
+                    chart_maxes.append(max_score)
+        rows.append(((disp_title, note["_date_str"], note_str, perc), tag, exam_key, full_title))
+    average = total / cnt if cnt > 0 else None
+    dates = np.array(chart_dates, dtype="datetime64[D]")
+    percentages = np.array(chart_scores, dtype=np.float64) / np.array(chart_maxes, dtype=np.float64) * 100.0
+    order = np.argsort(dates, kind="stable")
+    return rows, average, dates[order], percentages[order]
+
+def split_period_url(url):
+    """
+    Split a gradebook URL around its period segment ("/pN").
+    Returns a tuple (base_url, period, url_suffix): the URL before "/pN", the period
+    number and the URL after "/pN". A URL without period gives (url, 1, "").
+    """
+    # The period is normally the last path segment: no regex needed
+    head, sep, tail = url.rpartition("/p")
+    if sep and tail.isdigit():
+        return head, int(tail), ""
+    match = _PERIOD_RE.search(url)
     if match:
-        current = int(match.group(1))
-        new_period = current + delta
-        if new_period < 1:
-            new_period = 1
-        new_url = re.sub(r'/p\d+', f'/p{new_period}', url)
-        return new_url, new_period
-    else:
-        return url + "/p1", 1
+        return url[:match.start()], int(match.group(1)), url[match.end():]
+    return url, 1, ""
+
+def period_url(course, period):
+    """
+    Return the gradebook URL of a course for the given period.
+    """
+    return f"{course['base_url']}/p{period}{course['url_suffix']}"
 
 # --- Graphical User Interface using ttkbootstrap ---
 class App(ttk.Window):
@@ -203,6 +632,8 @@ class App(ttk.Window):
         self.geometry("1200x800")
         self.session = None          # User session after successful login
         self.courses = []            # List of courses data
+        self.courses_by_item = {}    # Mapping from course treeview item to course data
+        self.courses_digest = None   # MD5 of the courses page currently displayed
         self.selected_course = None  # Currently selected course
         self.notes = []              # List of notes for the selected course
         self.current_period = None   # Current period being viewed
@@ -211,24 +642,67 @@ class App(ttk.Window):
         self.user_email = ""         # Email of the logged in user
         self.ignored_exams = set()   # Set of exam keys that are ignored
         self.export_frame = None     # Frame for export functionality (integrated in main window)
+        self.pool = self.create_pool()  # Bounded pool running the background tasks
+        self.prefetch_slots = threading.BoundedSemaphore(2)  # Limit on concurrent period prefetches
+        self.pdf_pool = None         # Worker process rendering the PDF reports (started on first export)
+        self.save_pending = None     # Scheduled (debounced) save of the ignored exams
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.create_login_frame()    # Start with login frame
         self.load_saved_credentials()  # Load saved credentials (if any)
 
+    # --- Background Tasks ---
+    def create_pool(self):
+        """
+        Create the bounded thread pool used for every background task.
+        """
+        return ThreadPoolExecutor(max_workers=4, thread_name_prefix="notesflo")
+
+    def get_pdf_pool(self):
+        """
+        Return the process pool rendering the PDF reports, starting it on first use.
+        The worker is spawned (not forked) so it never inherits the Tk interpreter.
+        """
+        if self.pdf_pool is None:
+            self.pdf_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self.pdf_pool
+
+    def discard_pdf_pool(self, pool):
+        """
+        Drop a PDF process pool whose worker died, so the next export starts a fresh one.
+        """
+        if pool is not None and pool is self.pdf_pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.pdf_pool = None
+
+    def run_in_background(self, fn):
+        """
+        Run fn in the background thread pool and report any uncaught error.
+        """
+        future = self.pool.submit(fn)
+        future.add_done_callback(self.on_background_done)
+        return future
+
+    def on_background_done(self, future):
+        """
+        Print the error of a background task that failed (cancelled tasks are ignored).
+        """
+        if not future.cancelled() and future.exception() is not None:
+            print("Erreur lors d'une tâche en arrière-plan:", future.exception())
+
     # --- Credential Storage with Keyring ---
     def load_saved_credentials(self):
         """
         Load saved email from config.json and retrieve the password securely from keyring.
         """
         try:
-            with open("config.json", "r") as f:
-                config = json.load(f)
-                email = config.get("email", "")
-                if email:
-                    password = keyring.get_password("CarnetDeNotesApp", email)
-                    if password:
-                        self.email_var.set(email)
-                        self.password_var.set(password)
-                        self.remember_var.set(True)
+            config = read_json("config.json")
+            email = config.get("email", "")
+            if email:
+                password = keyring.get_password("CarnetDeNotesApp", email)
+                if password:
+                    self.email_var.set(email)
+                    self.password_var.set(password)
+                    self.remember_var.set(True)
         except Exception:
             pass
 
@@ -237,8 +711,7 @@ class App(ttk.Window):
         Save the email to config.json and store the password securely using keyring.
         """
         try:
-            with open("config.json", "w") as f:
-                json.dump({"email": email}, f)
+            write_json("config.json", {"email": email})
             keyring.set_password("CarnetDeNotesApp", email, password)
         except Exception as e:
             print("Erreur lors de l'enregistrement des identifiants:", e)
@@ -262,23 +735,45 @@ class App(ttk.Window):
         """
         filename = f"ignored_exams_{self.user_email}.json"
         try:
-            with open(filename, "r") as f:
-                lst = json.load(f)
-                self.ignored_exams = set(lst)
+            # Files written before keys were hashed contain the full keys
+            self.ignored_exams = {key if _EXAM_KEY_RE.fullmatch(key) else hash_exam_key(key)
+                                  for key in read_json(filename)}
         except Exception:
             self.ignored_exams = set()
 
     def save_ignored_exams(self):
         """
-        Save the list of ignored exams to a user-specific JSON file.
+        Schedule saving the ignored exams; toggles within 500 ms are written once.
+        """
+        if self.save_pending is not None:
+            self.after_cancel(self.save_pending)
+        self.save_pending = self.after(500, self.flush_ignored_exams)
+
+    def flush_ignored_exams(self):
+        """
+        Save the list of ignored exams to a user-specific JSON file (if a save is pending).
         """
+        if self.save_pending is None:
+            return
+        self.after_cancel(self.save_pending)
+        self.save_pending = None
         filename = f"ignored_exams_{self.user_email}.json"
         try:
-            with open(filename, "w") as f:
-                json.dump(list(self.ignored_exams), f)
+            write_json(filename, list(self.ignored_exams))
         except Exception as e:
             print("Erreur lors de la sauvegarde des interros ignorées:", e)
 
+    def on_close(self):
+        """
+        Write any pending save, stop the PDF worker and clear the cached gradebook pages before closing the window.
+        """
+        self.flush_ignored_exams()
+        if self.pdf_pool is not None:
+            self.pdf_pool.shutdown(wait=False, cancel_futures=True)
+        # The HTTP cache holds the user's grades: do not leave it on disk
+        clear_caches()
+        self.destroy()
+
     def create_login_frame(self):
         """
         Create and display the login frame where the user inputs credentials.
@@ -312,27 +807,38 @@ class App(ttk.Window):
         email = self.email_var.get().strip()
         password = self.password_var.get().strip()
         if not email or not password:
-            messagebox.show_error("Erreur", "Veuillez remplir tous les champs.")
+            messagebox.showerror("Erreur", "Veuillez remplir tous les champs.")
             return
         self.login_button.config(state=DISABLED)
         self.status_label.config(text="Connexion en cours...")
+        remember = self.remember_var.get()
         def login_thread():
-            global session
-            s = login_request(email, password)
+            try:
+                s = login_request(email, password)
+            except requests.RequestException as e:
+                print("Erreur lors de la connexion:", e)
+                s = None
             if s:
-                session = s
-                self.session = s
-                self.status_label.config(text="Connexion réussie !")
-                self.user_email = email
-                if self.remember_var.get():
+                if remember:
                     self.save_credentials(email, password)
                 else:
                     self.remove_credentials(email)
-                self.after(500, self.show_main_interface)
-            else:
-                self.status_label.config(text="Échec de la connexion.")
-            self.login_button.config(state=NORMAL)
-        threading.Thread(target=login_thread).start()
+            # Widgets are only updated from the Tk main thread
+            self.after(0, lambda: self.finish_login(s, email))
+        self.run_in_background(login_thread)
+
+    def finish_login(self, s, email):
+        """
+        Update the login frame once the login request has completed (main thread).
+        """
+        if s:
+            self.session = s
+            self.user_email = email
+            self.status_label.config(text="Connexion réussie !")
+            self.after(500, self.show_main_interface)
+        else:
+            self.status_label.config(text="Échec de la connexion.")
+        self.login_button.config(state=NORMAL)
 
     def show_main_interface(self):
         """
@@ -365,6 +871,8 @@ class App(ttk.Window):
         sidebar_title.pack(pady=5)
         refresh_btn = ttk.Button(self.sidebar, text="Actualiser", command=self.load_courses, bootstyle=INFO)
         refresh_btn.pack(pady=5)
+        force_refresh_btn = ttk.Button(self.sidebar, text="Forcer l'actualisation", command=self.force_refresh, bootstyle=WARNING)
+        force_refresh_btn.pack(pady=5)
         self.course_tree = ttk.Treeview(self.sidebar, columns=("course", "teacher"), show="headings", selectmode="browse")
         self.course_tree.heading("course", text="Cours")
         self.course_tree.heading("teacher", text="Enseignant")
@@ -404,13 +912,30 @@ class App(ttk.Window):
         self.exam_keys = {}
         self.chart_frame = ttk.Frame(self.content)
         self.chart_frame.pack(expand=TRUE, fill=BOTH, pady=5)
+        # Chart figure and canvas are created on the first plot_chart and then redrawn
+        self.chart_fig = None
+        self.chart_ax = None
+        self.chart_canvas = None
+        self.chart_empty_label = ttk.Label(self.chart_frame, text="Aucune note trouvée pour cette période.", font=("Helvetica", 12))
 
     def logout(self):
         """
         Logout by clearing session and showing the login frame.
         """
+        self.flush_ignored_exams()
+        SESSION.cookies.clear()
+        clear_caches()
+        if self.chart_fig is not None:
+            import matplotlib.pyplot as plt
+            plt.close(self.chart_fig)
+        # Drop the pending tasks of the previous session and start with a fresh pool
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self.create_pool()
+        self.prefetch_slots = threading.BoundedSemaphore(2)
         self.session = None
         self.courses = []
+        self.courses_by_item = {}
+        self.courses_digest = None
         self.selected_course = None
         self.notes = []
         for widget in self.winfo_children():
@@ -423,18 +948,42 @@ class App(ttk.Window):
         Load the list of courses by fetching and parsing the courses page.
         """
         if not self.session:
-            messagebox.show_error("Erreur", "Connectez-vous d'abord.")
+            messagebox.showerror("Erreur", "Connectez-vous d'abord.")
             return
         def thread_load():
             html = fetch_courses()
             if html:
-                self.courses = parse_courses(html)
-                self.course_tree.delete(*self.course_tree.get_children())
-                for course in self.courses:
-                    self.course_tree.insert("", "end", values=(course["course"], course["teacher"]), tags=(course["url"],))
+                digest = hashlib.md5(html.encode()).hexdigest()
+                if digest == self.courses_digest:
+                    # Unchanged page: keep the parsed courses (and the tree selection)
+                    return
+                courses = parse_courses(html)
+                self.after(0, lambda: self.populate_courses(courses, digest))
             else:
-                messagebox.show_error("Erreur", "Impossible de charger les cours.")
-        threading.Thread(target=thread_load).start()
+                self.after(0, lambda: messagebox.showerror("Erreur", "Impossible de charger les cours."))
+        self.run_in_background(thread_load)
+
+    def populate_courses(self, courses, digest):
+        """
+        Fill the courses treeview with parsed courses (main thread).
+        """
+        self.courses = courses
+        self.courses_digest = digest
+        self.course_tree.delete(*self.course_tree.get_children())
+        courses_by_item = {}
+        for course in courses:
+            item = self.course_tree.insert("", "end", values=(course["course"], course["teacher"]), tags=(course["url"],))
+            courses_by_item[item] = course
+        self.courses_by_item = courses_by_item
+
+    def force_refresh(self):
+        """
+        Clear the HTTP cache and reload the courses (and the current notes) from the server.
+        """
+        clear_caches()
+        self.load_courses()
+        if self.selected_course:
+            self.load_notes()
 
     def on_course_select(self, event):
         """
@@ -442,34 +991,22 @@ class App(ttk.Window):
         """
         selected = self.course_tree.focus()
         if selected:
-            url = self.course_tree.item(selected, "tags")[0]
-            for course in self.courses:
-                if course["url"] == url:
-                    self.selected_course = course
-                    break
-            period = self.extract_period(self.selected_course["url"])
+            self.selected_course = self.courses_by_item.get(selected, self.selected_course)
+            period = self.selected_course["period"]
             self.current_period = period
             self.period_label.config(text=f"Période : {period}")
             self.load_notes()
 
-    def extract_period(self, url):
-        """
-        Extract the period number from the URL (e.g., "/p1").
-        """
-        match = re.search(r'/p(\d+)', url)
-        if match:
-            return int(match.group(1))
-        return 1
-
     def change_period(self, delta):
         """
         Change the current period by delta (e.g., previous or next period).
         """
         if not self.selected_course:
-            messagebox.show_error("Erreur", "Sélectionnez un cours dans la liste.")
+            messagebox.showerror("Erreur", "Sélectionnez un cours dans la liste.")
             return
-        new_url, new_period = update_period_url(self.selected_course["url"], delta)
-        self.selected_course["url"] = new_url
+        course = self.selected_course
+        course["period"] = new_period = max(1, course["period"] + delta)
+        course["url"] = period_url(course, new_period)
         self.current_period = new_period
         self.period_label.config(text=f"Période : {new_period}")
         self.load_notes()
@@ -479,86 +1016,107 @@ class App(ttk.Window):
         Load and combine notes from all periods.
         """
         if not self.selected_course:
-            messagebox.show_error("Erreur", "Sélectionnez un cours dans la liste.")
+            messagebox.showerror("Erreur", "Sélectionnez un cours dans la liste.")
             return
-        base_url = re.sub(r'/p\d+', '', self.selected_course["url"])
-        urls = [f"{base_url}/p{i}" for i in [1, 2, 3]]
-        combined_notes = []
+        course = self.selected_course
+        course_url = course["url"]
+        ignored_exams = frozenset(self.ignored_exams)
         def thread_load_total():
-            for url in urls:
-                html = fetch_notes(url)
-                if html:
-                    combined_notes.extend(parse_notes(html))
-            self.after(0, lambda: self.handle_loaded_notes(combined_notes))
+            # Parsing and view preparation run here; the main thread only renders
+            combined_notes = prepare_notes(fetch_total_notes(course), course_url)
+            view = build_notes_view(combined_notes, ignored_exams)
+            self.after(0, lambda: self.handle_loaded_notes(combined_notes, view, ignored_exams))
             self.after(0, lambda: self.period_label.config(text="Total"))
-        threading.Thread(target=thread_load_total).start()
+        self.run_in_background(thread_load_total)
 
     def load_notes(self):
         """
         Load the notes for the selected course and current period.
         """
         if not self.selected_course:
-            messagebox.show_error("Erreur", "Sélectionnez un cours dans la liste.")
+            messagebox.showerror("Erreur", "Sélectionnez un cours dans la liste.")
             return
-        url = self.selected_course["url"]
+        course = self.selected_course
+        url = course["url"]
+        period = course["period"]
+        ignored_exams = frozenset(self.ignored_exams)
         def thread_load_notes():
             html = fetch_notes(url)
             if html:
-                parsed_notes = parse_notes(html)
-                self.after(0, lambda: self.handle_loaded_notes(parsed_notes))
+                # Parsing and view preparation run here; the main thread only renders
+                parsed_notes = prepare_notes(parse_notes_cached(url, html), url)
+                view = build_notes_view(parsed_notes, ignored_exams)
+                self.after(0, lambda: self.handle_loaded_notes(parsed_notes, view, ignored_exams))
+                self.prefetch_adjacent_periods(course, period)
             else:
-                self.after(0, lambda: messagebox.show_error("Erreur", "Impossible de charger le carnet de notes."))
-        threading.Thread(target=thread_load_notes).start()
+                self.after(0, lambda: messagebox.showerror("Erreur", "Impossible de charger le carnet de notes."))
+        self.run_in_background(thread_load_notes)
+
+    def prefetch_adjacent_periods(self, course, period):
+        """
+        Fetch the previous and next periods in the background so that switching period
+        is served from the cache. At most two prefetches run at the same time.
+        """
+        slots = self.prefetch_slots
+        for adjacent in (period - 1, period + 1):
+            url = period_url(course, adjacent)
+            if adjacent not in PERIODS or SESSION.cache.contains(url=url):
+                continue
+            if not slots.acquire(blocking=False):
+                return
+            def prefetch(url=url):
+                try:
+                    fetch_parsed_notes(url)
+                finally:
+                    slots.release()
+            self.run_in_background(prefetch)
 
-    def handle_loaded_notes(self, notes):
+    def handle_loaded_notes(self, notes, view, ignored_exams):
         """
         Update the UI with the loaded notes and update the chart.
+        ignored_exams is the snapshot the view was built with: if exams were ignored or
+        included since, the view is rebuilt with the current ones.
         """
         self.notes = notes
-        self.update_notes_tree()
-        self.plot_chart()
+        if ignored_exams != self.ignored_exams:
+            view = build_notes_view(notes, self.ignored_exams)
+        self.render_notes_view(view)
 
-    def update_notes_tree(self):
+    def render_notes_view(self, view):
         """
-        Update the notes treeview with new data and compute the average.
+        Render a view computed by build_notes_view.
         """
+        rows, average, dates, percentages = view
+        self.update_notes_tree(rows, average)
+        self.plot_chart(dates, percentages)
+
+    def update_notes_tree(self, rows, average):
+        """
+        Update the notes treeview with prepared rows and display the average.
+        """
+        # Unmap the treeview while it is rebuilt so Tk lays it out once, not per insert
+        self.note_tree.pack_forget()
         self.note_tree.delete(*self.note_tree.get_children())
-        self.full_titles = {}
-        self.exam_keys = {}
-        total = 0
-        cnt = 0
-        for note in self.notes:
-            date_str = note["date"].strftime("%d/%m/%Y") if note["date"] else ""
-            if note["score"] is not None and note["max_score"] is not None:
-                note_str = f"{note['score']}/{note['max_score']}"
-                val = note["score"] / note["max_score"] * 100
-                perc = f"{val:.1f}%"
-            else:
-                note_str = ""
-                perc = ""
-                val = None
-            full_title = note["title"]
-            disp_title = full_title if len(full_title) <= 30 else full_title[:30] + "..."
-            exam_key = f"{self.selected_course['url']}_{date_str}_{full_title}"
-            tag = ""
-            if exam_key in self.ignored_exams:
-                tag = "ignored"
-            else:
-                if val is not None:
-                    if val < 50:
-                        tag = "low"
-                    elif val >= 80:
-                        tag = "high"
-                    total += val
-                    cnt += 1
-            item = self.note_tree.insert("", "end", values=(disp_title, date_str, note_str, perc), tags=(tag,))
-            self.exam_keys[item] = exam_key
+        full_titles = {}
+        exam_keys = {}
+        insert = self.note_tree.insert
+        for values, tag, exam_key, full_title in rows:
+            item = insert("", "end", values=values, tags=(tag,))
+            exam_keys[item] = exam_key
             if len(full_title) > 30:
-                self.full_titles[item] = full_title
-        if cnt > 0:
-            avg = total / cnt
-            col = "red" if avg < 50 else "green" if avg >= 80 else "black"
-            self.avg_label.config(text=f"Moyenne actuelle : {avg:.1f}%", foreground=col)
+                full_titles[item] = full_title
+        self.full_titles = full_titles
+        self.exam_keys = exam_keys
+        self.note_tree.pack(expand=TRUE, fill=BOTH, pady=10, before=self.chart_frame)
+        self.update_average_label(average)
+
+    def update_average_label(self, average):
+        """
+        Display the current average (None if there is no graded note).
+        """
+        if average is not None:
+            col = "red" if average < 50 else "green" if average >= 80 else "black"
+            self.avg_label.config(text=f"Moyenne actuelle : {average:.1f}%", foreground=col)
         else:
             self.avg_label.config(text="Moyenne actuelle : -", foreground="black")
 
@@ -640,42 +1198,33 @@ class App(ttk.Window):
         else:
             self.ignored_exams.add(exam_key)
         self.save_ignored_exams()
-        self.update_notes_tree()
-        self.plot_chart()
+        rows, average, dates, percentages = build_notes_view(self.notes, self.ignored_exams)
+        # Only the rows of this exam change: retag them instead of rebuilding the treeview
+        for tree_item, (_, tag, row_key, _) in zip(self.note_tree.get_children(), rows):
+            if row_key == exam_key:
+                self.note_tree.item(tree_item, tags=(tag,))
+        self.update_average_label(average)
+        self.plot_chart(dates, percentages)
 
-    def plot_chart(self):
+    def plot_chart(self, dates, percentages):
         """
         Plot the evolution of grades using matplotlib and embed the chart in the UI.
         """
-        for widget in self.chart_frame.winfo_children():
-            widget.destroy()
-        valid_notes = [n for n in self.notes if n["date"] and n["score"] is not None and n["max_score"] and
-                       f"{self.selected_course['url']}_{n['date'].strftime('%d/%m/%Y')}_{n['title']}" not in self.ignored_exams]
-        if not valid_notes:
-            lbl = ttk.Label(self.chart_frame, text="Aucune note trouvée pour cette période.", font=("Helvetica", 12))
-            lbl.pack(pady=20)
+        if len(dates) == 0:
+            if self.chart_canvas is not None:
+                self.chart_canvas.get_tk_widget().pack_forget()
+            self.chart_empty_label.pack(pady=20)
             return
-        sorted_notes = sorted(valid_notes, key=lambda n: n["date"])
-        dates = [n["date"] for n in sorted_notes]
-        percentages = [n["score"] / n["max_score"] * 100 for n in sorted_notes]
-        cum_avg = []
-        running = 0
-        for i, p in enumerate(percentages):
-            running += p
-            cum_avg.append(running / (i + 1))
-        fig, ax = plt.subplots(figsize=(5, 3))
-        ax.plot(dates, percentages, marker='o', linestyle='-', label="Note individuelle")
-        ax.plot(dates, cum_avg, marker='', linestyle='--', color='red', label="Moyenne cumulée")
-        ax.set_title("Évolution des notes")
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Pourcentage")
-        ax.set_ylim(0, 110)
-        ax.legend()
-        ax.grid(True, linestyle="--", alpha=0.5)
-        fig.autofmt_xdate()
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(expand=TRUE, fill=BOTH)
+        if self.chart_canvas is None:
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.chart_fig, self.chart_ax = plt.subplots(figsize=(5, 3))
+            self.chart_canvas = FigureCanvasTkAgg(self.chart_fig, master=self.chart_frame)
+        # Redraw on the persistent figure instead of building a new figure and canvas
+        draw_grades_chart(self.chart_ax, dates, percentages)
+        self.chart_canvas.draw_idle()
+        self.chart_empty_label.pack_forget()
+        self.chart_canvas.get_tk_widget().pack(expand=TRUE, fill=BOTH)
 
     # --- Export Panel (Integrated into Main Window) ---
     def open_export_panel(self):
@@ -713,6 +1262,8 @@ class App(ttk.Window):
         period_options = ["Période 1", "Période 2", "Période 3", "Total"]
         period_dropdown = ttk.Combobox(period_frame, textvariable=self.period_export_var, values=period_options, state="readonly")
         period_dropdown.pack(fill="x", padx=5, pady=5)
+        self.include_charts_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(period_frame, text="Inclure les graphiques", variable=self.include_charts_var).pack(anchor="w", padx=5)
 
         # Frame for action buttons (Export / Annuler)
         action_frame = ttk.Frame(self.export_frame, padding=10)
@@ -741,6 +1292,7 @@ class App(ttk.Window):
             if var.get():
                 selected_courses.append(course)
         period = self.period_export_var.get()
+        include_charts = self.include_charts_var.get()
 
         # Ask user for the file save location using a file dialog
         downloads_folder = os.path.join(os.path.expanduser("~"), "Downloads")
@@ -759,109 +1311,41 @@ class App(ttk.Window):
         waiting_label = ttk.Label(self.export_frame, text="Veuillez patienter pendant la création du PDF...", font=("Helvetica", 12))
         waiting_label.pack(pady=20)
 
+        # Periods whose notes are exported
+        periods = PERIODS if period == "Total" else (int(period.split()[-1]),)
+
+        pdf_pool = self.get_pdf_pool()
+
         def pdf_export_task():
             try:
-                c = canvas.Canvas(file_path, pagesize=letter)
-                width, height = letter
-                y = height - 50
-
-                c.setFont("Helvetica-Bold", 20)
-                c.drawCentredString(width/2, y, "Rapport de Notes")
-                y -= 40
-                c.setFont("Helvetica", 14)
-                c.drawCentredString(width/2, y, f"Période: {period}")
-                y -= 40
-
-                # Iterate over each selected course
-                for course in selected_courses:
-                    c.setFont("Helvetica-Bold", 16)
-                    c.drawString(50, y, f"Cours: {course['course']} - {course['teacher']}")
-                    y -= 25
-
-                    # Retrieve notes based on the selected period
-                    if period == "Total":
-                        base_url = re.sub(r'/p\d+', '', course["url"])
-                        notes = []
-                        for p in [1, 2, 3]:
-                            url = f"{base_url}/p{p}"
-                            html = fetch_notes(url)
-                            if html:
-                                notes.extend(parse_notes(html))
-                    else:
-                        p = int(period.split()[-1])
-                        new_url, _ = update_period_url(course["url"], p - self.extract_period(course["url"]))
-                        html = fetch_notes(new_url)
-                        notes = parse_notes(html) if html else []
-
-                    if not notes:
-                        c.setFont("Helvetica-Oblique", 12)
-                        c.drawString(70, y, "Aucune note disponible.")
-                        y -= 20
-                    else:
-                        c.setFont("Helvetica-Bold", 12)
-                        c.drawString(50, y, "Date")
-                        c.drawString(120, y, "Titre")
-                        c.drawString(450, y, "Note")
-                        y -= 20
-                        c.setFont("Helvetica", 12)
-                        total = 0
-                        count = 0
-                        graph_data = []
-                        for note in notes:
-                            date_str = note["date"].strftime("%d/%m/%Y") if note["date"] else ""
-                            title = note["title"] if len(note["title"]) <= 50 else note["title"][:50] + "..."
-                            note_str = f"{note['score']}/{note['max_score']}" if note["score"] is not None and note["max_score"] is not None else ""
-                            c.drawString(50, y, date_str)
-                            c.drawString(120, y, title)
-                            c.drawString(450, y, note_str)
-                            y -= 20
-                            if note["score"] is not None and note["max_score"] is not None:
-                                val = note["score"] / note["max_score"] * 100
-                                total += val
-                                count += 1
-                                graph_data.append((note["date"], val))
-                            if y < 100:
-                                c.showPage()
-                                y = height - 50
-                        if count > 0:
-                            avg = total / count
-                            c.setFont("Helvetica-Bold", 12)
-                            c.drawString(50, y, f"Moyenne: {avg:.1f}%")
-                            y -= 30
-                        if graph_data:
-                            graph_data.sort(key=lambda x: x[0])
-                            dates, values = zip(*graph_data)
-                            cum_avg = []
-                            running = 0
-                            for i, v in enumerate(values):
-                                running += v
-                                cum_avg.append(running / (i + 1))
-                            fig, ax = plt.subplots(figsize=(5, 3))
-                            ax.plot(dates, values, marker='o', linestyle='-', label="Note individuelle")
-                            ax.plot(dates, cum_avg, marker='', linestyle='--', color='red', label="Moyenne cumulée")
-                            ax.set_title("Évolution des notes")
-                            ax.set_xlabel("Date")
-                            ax.set_ylabel("Pourcentage")
-                            ax.set_ylim(0, 110)
-                            ax.legend()
-                            ax.grid(True, linestyle="--", alpha=0.5)
-                            fig.autofmt_xdate()
-                            temp_img = "temp_chart.png"
-                            fig.savefig(temp_img, dpi=100)
-                            plt.close(fig)
-                            c.drawImage(temp_img, 50, y-200, width=500, height=200)
-                            y -= 220
-                            os.remove(temp_img)
-                    y -= 30
-                    if y < 100:
-                        c.showPage()
-                        y = height - 50
-                c.save()
-                self.after(0, lambda: self.pdf_export_complete(file_path))
+                # Fetch every page here (the session and caches live in this process),
+                # then let the worker process draw the report off the UI's interpreter
+                courses_notes = fetch_courses_notes(selected_courses, periods)
+                future = pdf_pool.submit(build_pdf_report, file_path, period, selected_courses, courses_notes, include_charts)
             except Exception as e:
-                self.after(0, lambda: self.pdf_export_failed(str(e)))
-        
-        threading.Thread(target=pdf_export_task).start()
+                if isinstance(e, BrokenProcessPool):
+                    self.after(0, lambda: self.discard_pdf_pool(pdf_pool))
+                # e is unbound once the except block ends: pass its message, not e itself
+                message = str(e)
+                self.after(0, lambda: self.pdf_export_failed(message))
+                return
+            future.add_done_callback(lambda f: self.after(0, lambda: self.pdf_export_done(f, file_path, pdf_pool)))
+
+        self.run_in_background(pdf_export_task)
+
+    def pdf_export_done(self, future, file_path, pool):
+        """
+        Report the outcome of the PDF worker process (of the given pool) in the export panel.
+        """
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self.discard_pdf_pool(pool)
+        if error is not None:
+            self.pdf_export_failed(str(error))
+        else:
+            self.pdf_export_complete(file_path)
 
     def pdf_export_complete(self, file_path):
         """